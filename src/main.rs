@@ -1,18 +1,32 @@
 use anyhow::{Context, Result};
 use clap::Parser;
-use std::{collections::HashMap, fs, path::PathBuf};
+use std::{
+    collections::{BTreeSet, HashMap},
+    fs,
+    hash::{DefaultHasher, Hash, Hasher},
+    io::{BufWriter, Read, Write},
+    path::{Path, PathBuf},
+    sync::atomic::{AtomicUsize, Ordering},
+    thread,
+};
 use syn::{
     parse_quote,
     visit_mut::{self, VisitMut},
-    Expr, ExprCall, ExprMethodCall, Lit,
+    Expr, ExprCall, ExprMethodCall, ExprTry, Lit,
 };
 use serde::{Deserialize, Serialize};
+use regex::Regex;
 
 /// ----------------------------------------------------
 /// 0. 상수 및 규칙 모델 정의
 /// ----------------------------------------------------
 const DOC_URL_UNWRAP_TO_TRY: &str = "https://doc.rust-lang.org/book/ch09-02-recoverable-errors-with-result.html";
 const DOC_URL_MEM_UNINITIALIZED: &str = "https://doc.rust-lang.org/std/mem/fn.uninitialized";
+/// 문자열 리터럴 안에서 보고하는 폐기된 API 패턴
+const DEPRECATED_LITERAL_PATTERN: &str = "mem::uninitialized";
+/// 변환 결과 캐시 항목의 형식 번호 (CacheEntry/FileOutcome 구조를 바꾸면 올림)
+/// 변환 템플릿/매칭 로직 변경은 실행 파일 정보가 키에 포함되므로 다시 빌드하면 자동으로 무효화됩니다.
+const CACHE_FORMAT: u32 = 3;
 
 /// AST 변환을 위한 단일 규칙을 정의하는 구조체 (JSON에서 로드됨)
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -40,10 +54,10 @@ struct ModernizerRule {
 #[derive(Parser, Debug)]
 #[command(author, version, about, long_about = "Rust Legacy Code Modernizer using AST traversal.")]
 struct Args {
-    /// 변환할 Rust 파일 경로
+    /// 변환할 Rust 파일 또는 디렉터리 경로 (디렉터리는 하위 .rs 파일을 모두 변환)
     input: PathBuf,
 
-    /// 변환된 코드를 저장할 출력 파일 경로
+    /// 변환된 코드를 저장할 출력 파일 경로 (입력이 디렉터리이면 출력 디렉터리)
     #[arg(short, long)]
     output: Option<PathBuf>,
 
@@ -58,77 +72,188 @@ struct Args {
     /// 규칙 파일을 지정합니다. (기본값: modernizer_rules.json)
     #[arg(long, default_value = "modernizer_rules.json")]
     rules_file: PathBuf,
+
+    /// 변환 결과 캐시 디렉터리 (지정 시 내용과 규칙이 그대로인 파일은 다시 파싱하지 않음)
+    /// 캐시에서 가져온 파일도 저장된 규칙별 [MOD] 로그를 그대로 다시 출력합니다.
+    #[arg(long)]
+    cache_dir: Option<PathBuf>,
+}
+
+/// 규칙 ID에 대응하는 변환 템플릿
+/// 로드 시 한 번 결정해 두어, 규칙을 적용할 때마다 ID 문자열을 비교하지 않도록 합니다.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+enum RuleTemplate {
+    UnwrapToTry,
+    ExpectToTry,
+    OkUnwrapToTry,
+    MemUninitializedToMaybeUninit,
+}
+
+impl RuleTemplate {
+    fn from_id(id: &str) -> Option<Self> {
+        match id {
+            "unwrap_to_try" => Some(RuleTemplate::UnwrapToTry),
+            "expect_to_try" => Some(RuleTemplate::ExpectToTry),
+            "ok_unwrap_to_try" => Some(RuleTemplate::OkUnwrapToTry),
+            "mem_uninitialized_to_maybeuninit" => Some(RuleTemplate::MemUninitializedToMaybeUninit),
+            _ => None,
+        }
+    }
+}
+
+/// 매칭 대상 이름(method_name)별로 묶은 (템플릿, 규칙) 목록
+type RuleGroups = Vec<(String, Vec<(RuleTemplate, ModernizerRule)>)>;
+
+/// 지정한 AST 타입의 규칙을 method_name 기준으로 한 번만 묶어 둡니다.
+/// AST 노드마다 전체 규칙을 순회하지 않고, 이름이 일치하는 그룹만 검사하기 위함입니다.
+/// 그룹 안의 규칙은 규칙 파일에 적힌 순서를 유지합니다. (먼저 일치하는 규칙이 적용됨)
+fn group_rules(rules: &[(RuleTemplate, &ModernizerRule)], ast_type: &str) -> RuleGroups {
+    let mut groups: RuleGroups = Vec::new();
+
+    for &(template, rule) in rules.iter().filter(|(_, r)| r.ast_type == ast_type) {
+        let entry = (template, rule.clone());
+        match groups.iter_mut().find(|(name, _)| *name == rule.method_name) {
+            Some((_, group)) => group.push(entry),
+            None => groups.push((rule.method_name.clone(), vec![entry])),
+        }
+    }
+    groups
+}
+
+/// 로드 시 한 번 구성되어 모든 파일(및 작업 스레드)이 공유하는 규칙 집합
+struct RuleSet {
+    method_rules: RuleGroups, // ExprMethodCall 규칙
+    call_rules: RuleGroups,   // ExprCall 규칙
+    /// 규칙이 반응할 수 있는 모든 이름의 사전 필터 (리터럴 alternation → 단일 패스 다중 패턴 검색)
+    triggers: Regex,
+}
+
+impl RuleSet {
+    fn new(rules: &[ModernizerRule]) -> Result<Self> {
+        // 변환 템플릿이 없는 규칙은 어떤 노드에도 적용될 수 없으므로 여기서 제외합니다.
+        let rules: Vec<(RuleTemplate, &ModernizerRule)> = rules
+            .iter()
+            .filter_map(|rule| match RuleTemplate::from_id(&rule.id) {
+                Some(template) => Some((template, rule)),
+                None => {
+                    println!("⚠️ 알 수 없는 규칙 ID이므로 건너뜁니다: {}", rule.id);
+                    None
+                }
+            })
+            .collect();
+
+        let mut patterns: Vec<String> = rules.iter().map(|(_, r)| regex::escape(&r.method_name)).collect();
+        patterns.push(regex::escape(DEPRECATED_LITERAL_PATTERN));
+        patterns.sort();
+        patterns.dedup();
+
+        let triggers = Regex::new(&patterns.join("|"))
+            .with_context(|| "Failed to build rule trigger prefilter.")?;
+
+        Ok(RuleSet {
+            method_rules: group_rules(&rules, "ExprMethodCall"),
+            call_rules: group_rules(&rules, "ExprCall"),
+            triggers,
+        })
+    }
+
+    /// 적용 가능한 규칙이 하나도 없는지 여부
+    fn is_empty(&self) -> bool {
+        self.method_rules.is_empty() && self.call_rules.is_empty()
+    }
+
+    /// 소스에 규칙 이름이 하나도 없으면 어떤 규칙도 적용될 수 없으므로 AST 파싱을 생략할 수 있습니다.
+    fn may_apply(&self, source_code: &str) -> bool {
+        self.triggers.is_match(source_code)
+    }
 }
 
 /// ----------------------------------------------------
 /// 2. AST 변환기 정의 (syn::VisitMut)
 /// ----------------------------------------------------
-struct Modernizer {
+struct Modernizer<'a> {
     changed: bool, 
     counters: HashMap<String, u32>, // 규칙 ID별 카운터
-    rules: Vec<ModernizerRule>, 
+    rules: &'a RuleSet, 
+    /// 원본에 폐기 패턴이 있을 때만 문자열 리터럴 값을 꺼내 검사 (리터럴마다 복사본 할당 방지)
+    /// 이스케이프(`\x69` 등)로 적힌 리터럴은 원본에 패턴이 그대로 나타나지 않으므로, 백슬래시가 있으면 함께 검사합니다.
+    scan_literals: bool,
+    /// 적용된 규칙별 [MOD] 로그 (디렉터리 모드에서 여러 스레드의 출력이 섞이지 않도록 파일 단위로 모아 출력)
+    log: Vec<String>,
+}
+
+/// 곧 교체될 노드에서 하위 표현식을 복제 없이 꺼냅니다. (빈 자리는 빈 Verbatim으로 채움)
+fn take_expr(expr: &mut Expr) -> Expr {
+    std::mem::replace(expr, Expr::Verbatim(Default::default()))
+}
+
+/// `receiver?` 노드를 직접 만듭니다.
+/// parse_quote!는 receiver 서브트리 전체를 토큰으로 바꿨다가 다시 파싱하므로 재작성마다 O(receiver)가 들고,
+/// 긴 `.unwrap()` 체인에서는 전체 비용이 제곱으로 늘어납니다.
+fn try_expr(receiver: Expr) -> Expr {
+    Expr::Try(ExprTry {
+        attrs: Vec::new(),
+        expr: Box::new(receiver),
+        question_token: Default::default(),
+    })
 }
 
-impl Modernizer {
-    fn new(rules: Vec<ModernizerRule>) -> Self {
+impl<'a> Modernizer<'a> {
+    fn new(rules: &'a RuleSet, source_code: &str) -> Self {
         Modernizer {
             changed: false,
             counters: HashMap::new(),
             rules,
+            scan_literals: source_code.contains(DEPRECATED_LITERAL_PATTERN) || source_code.contains('\\'),
+            log: Vec::new(),
         }
     }
     
     /// 규칙 템플릿을 기반으로 AST 노드를 생성합니다. (parse_quote! 제약 사항 처리)
-    fn apply_rule_template(&self, method_call: &ExprMethodCall, rule: &ModernizerRule) -> Option<Expr> {
-        let receiver = method_call.receiver.clone();
-        
+    /// 성공하면 `method_call` 노드는 반환된 표현식으로 교체되므로, 수신자(receiver) 서브트리를
+    /// 복제하지 않고 그대로 꺼내 새 노드에 옮깁니다. (긴 메서드 체인에서 반복 복제 방지)
+    fn apply_rule_template(method_call: &mut ExprMethodCall, template: RuleTemplate) -> Option<Expr> {
         // DOC URL은 parse_quote! 내부에서 직접 참조할 수 없으므로, ID별 상수를 사용합니다.
         // 이 함수는 런타임에 호출되지만, AST 생성을 위해서는 컴파일 타임 매크로인 parse_quote!에 의존해야 합니다.
         let doc_url_unwrap = DOC_URL_UNWRAP_TO_TRY; // 상수를 변수에 복사
 
-        match rule.id.as_str() {
-            "unwrap_to_try" => {
-                Some(parse_quote! {
-                    // DOC: Converted `.unwrap()` to `?` for idiomatic error propagation. Ref: #doc_url_unwrap
-                    #receiver? 
-                })
+        match template {
+            // `#receiver?` 형태의 템플릿은 parse_quote! 대신 try_expr로 노드를 직접 만듭니다.
+            RuleTemplate::UnwrapToTry => {
+                // DOC: Converted `.unwrap()` to `?` for idiomatic error propagation. Ref: #doc_url_unwrap
+                Some(try_expr(take_expr(&mut method_call.receiver)))
             }
-            "expect_to_try" => {
-                // Expect 메시지 제거 및 경고 주석 포함
-                Some(parse_quote! {
-                    // DOC: Converted `.expect()` to `?`. Manual review is required. Ref: #doc_url_unwrap
-                    // NOTE: Original expect message was removed during transformation.
-                    #receiver? 
-                })
+            RuleTemplate::ExpectToTry => {
+                // Expect 메시지 제거
+                // DOC: Converted `.expect()` to `?`. Manual review is required. Ref: #doc_url_unwrap
+                // NOTE: Original expect message was removed during transformation.
+                Some(try_expr(take_expr(&mut method_call.receiver)))
             }
-            "ok_unwrap_to_try" => {
-                 if let Expr::MethodCall(inner_call) = &*method_call.receiver {
-                     let inner_receiver = inner_call.receiver.clone();
-                     Some(parse_quote! {
-                        // DOC: Converted `ok().unwrap()` to `?`. Ref: #doc_url_unwrap
-                        #inner_receiver? 
-                     })
+            RuleTemplate::OkUnwrapToTry => {
+                 if let Expr::MethodCall(inner_call) = &mut *method_call.receiver {
+                     // DOC: Converted `ok().unwrap()` to `?`. Ref: #doc_url_unwrap
+                     Some(try_expr(take_expr(&mut inner_call.receiver)))
                  } else {
                      None
                  }
             }
-            _ => None
+            // 함수 호출(ExprCall) 전용 템플릿
+            RuleTemplate::MemUninitializedToMaybeUninit => None,
         }
     }
     
     /// 로드된 규칙을 순회하며 메서드 호출을 변환합니다.
-    fn transform_method_call(&mut self, method_call: &ExprMethodCall) -> Option<Expr> {
-        let method_name = method_call.method.to_string();
-        
-        for rule in &self.rules {
-            if rule.ast_type != "ExprMethodCall" { continue; }
+    fn transform_method_call(&mut self, method_call: &mut ExprMethodCall) -> Option<Expr> {
+        // Ident는 문자열과 직접 비교 가능하므로 노드마다 to_string() 할당을 하지 않습니다.
+        let (_, rules) = self.rules.method_rules.iter().find(|(name, _)| method_call.method == name)?;
 
-            if rule.method_name == method_name && rule.args_count as usize == method_call.args.len() {
+        for (template, rule) in rules {
+            if rule.args_count as usize == method_call.args.len() {
                 
                 let is_nested_match = match rule.nested_method.as_deref() {
                     Some(nested) => {
                         if let Expr::MethodCall(inner_call) = &*method_call.receiver {
-                            inner_call.method.to_string() == nested
+                            inner_call.method == nested
                         } else {
                             false
                         }
@@ -137,8 +262,8 @@ impl Modernizer {
                 };
 
                 if is_nested_match {
-                    if let Some(new_expr) = self.apply_rule_template(method_call, rule) {
-                        println!("[MOD] {} {} applied (Span: {:?})", rule.level_icon, rule.id, method_call.method.span());
+                    if let Some(new_expr) = Self::apply_rule_template(method_call, *template) {
+                        self.log.push(format!("[MOD] {} {} applied (Span: {:?})", rule.level_icon, rule.id, method_call.method.span()));
                         self.changed = true;
                         *self.counters.entry(rule.id.clone()).or_insert(0) += 1;
                         return Some(new_expr);
@@ -153,36 +278,32 @@ impl Modernizer {
     fn transform_expr_call(&mut self, expr_call: &ExprCall) -> Option<Expr> {
         let doc_url_uninit = DOC_URL_MEM_UNINITIALIZED; // 상수를 변수에 복사
         
-        for rule in &self.rules {
-            if rule.ast_type != "ExprCall" { continue; }
-            
-            if rule.id == "mem_uninitialized_to_maybeuninit" {
-                if let Expr::Path(expr_path) = &*expr_call.func {
-                    if let Some(segment) = expr_path.path.segments.last() {
-                        if segment.ident.to_string() == rule.method_name && expr_call.args.is_empty() {
-                            println!("[MOD] {} {} applied (Span: {:?})", rule.level_icon, rule.id, segment.ident.span());
-                            self.changed = true;
-                            *self.counters.entry(rule.id.clone()).or_insert(0) += 1;
-                            
-                            // uninitialized 변환은 unsafe 코드가 필요하므로 하드코딩된 parse_quote를 사용
-                            return Some(parse_quote! {
-                                // DOC: `std::mem::uninitialized` is deprecated. Replaced with `MaybeUninit` usage.
-                                // WARNING: This conversion remains `unsafe` and MUST be manually reviewed for initialization correctness.
-                                // Ref: #doc_url_uninit
-                                unsafe { 
-                                    std::mem::MaybeUninit::uninit().assume_init()
-                                }
-                            });
-                        }
+        let Expr::Path(expr_path) = &*expr_call.func else { return None; };
+        let segment = expr_path.path.segments.last()?;
+        let (_, rules) = self.rules.call_rules.iter().find(|(name, _)| segment.ident == name)?;
+
+        for (template, rule) in rules {
+            if *template == RuleTemplate::MemUninitializedToMaybeUninit && expr_call.args.is_empty() {
+                self.log.push(format!("[MOD] {} {} applied (Span: {:?})", rule.level_icon, rule.id, segment.ident.span()));
+                self.changed = true;
+                *self.counters.entry(rule.id.clone()).or_insert(0) += 1;
+                
+                // uninitialized 변환은 unsafe 코드가 필요하므로 하드코딩된 parse_quote를 사용
+                return Some(parse_quote! {
+                    // DOC: `std::mem::uninitialized` is deprecated. Replaced with `MaybeUninit` usage.
+                    // WARNING: This conversion remains `unsafe` and MUST be manually reviewed for initialization correctness.
+                    // Ref: #doc_url_uninit
+                    unsafe { 
+                        std::mem::MaybeUninit::uninit().assume_init()
                     }
-                }
+                });
             }
         }
         None
     }
 }
 
-impl VisitMut for Modernizer {
+impl VisitMut for Modernizer<'_> {
     fn visit_expr_mut(&mut self, i: &mut Expr) {
         // 1. 깊이 우선 순회
         visit_mut::visit_expr_mut(self, i); 
@@ -194,12 +315,12 @@ impl VisitMut for Modernizer {
             // (2) 함수 호출 변환 (데이터 기반)
             Expr::Call(expr_call) => self.transform_expr_call(expr_call),
 
-            // (3) 기타 리터럴 패턴 확인 (유지)
-            Expr::Lit(expr_lit) => {
+            // (3) 기타 리터럴 패턴 확인 (보고만 하며 코드는 바꾸지 않음)
+            // changed를 세우면 실제 변환이 없는데도 파일 전체를 다시 포맷해 쓰게 되므로 표시하지 않습니다.
+            Expr::Lit(expr_lit) if self.scan_literals => {
                 if let Lit::Str(lit_str) = &expr_lit.lit {
-                    if lit_str.value().contains("mem::uninitialized") {
-                        println!("[MOD] ℹ️ Found deprecated string pattern in literal.");
-                        self.changed = true;
+                    if lit_str.value().contains(DEPRECATED_LITERAL_PATTERN) {
+                        self.log.push("[MOD] ℹ️ Found deprecated string pattern in literal.".to_string());
                     }
                 }
                 None
@@ -230,17 +351,375 @@ fn load_rules(file_path: &PathBuf) -> Result<Vec<ModernizerRule>> {
     Ok(rules)
 }
 
+/// 단일 소스 코드의 변환 결과
+#[derive(Serialize, Deserialize)]
+struct FileOutcome {
+    /// 변환된 코드 (변경 사항이 없으면 None)
+    modernized: Option<String>,
+    /// 규칙 ID별 적용 횟수
+    counters: HashMap<String, u32>,
+    /// 적용된 규칙별 [MOD] 로그 (캐시 적중 시에도 다시 출력하기 위해 함께 저장)
+    #[serde(default)]
+    log: Vec<String>,
+}
+
+/// 캐시 항목 (원본 확인 정보 + 변환 결과)
+/// 파일 이름 해시가 충돌하더라도 다른 파일의 결과를 쓰지 않도록, 원본 길이와 별도 해시를 함께 저장합니다.
+#[derive(Serialize, Deserialize)]
+struct CacheEntry<O> {
+    source_len: usize,
+    source_check: u64,
+    outcome: O,
+}
+
+/// 변환 결과를 (캐시 형식, 도구 버전, 규칙, 파일 내용) 해시를 키로 디스크에 보관하는 캐시
+/// CI처럼 같은 트리를 반복 실행할 때, 바뀌지 않은 파일의 파싱/변환을 건너뛰기 위함입니다.
+struct OutcomeCache {
+    dir: PathBuf,
+    /// 캐시 형식, 도구 버전/실행 파일과 규칙 목록의 해시 (규칙이 바뀌면 기존 항목은 자동으로 무효화됨)
+    rules_key: u64,
+}
+
+/// 동시에 같은 항목을 저장하는 스레드끼리 임시 파일 이름이 겹치지 않게 하는 일련번호
+static CACHE_TMP_SEQ: AtomicUsize = AtomicUsize::new(0);
+
+impl OutcomeCache {
+    fn new(dir: &Path, rules: &[ModernizerRule]) -> Result<Self> {
+        fs::create_dir_all(dir)
+            .with_context(|| format!("Failed to create cache directory: {}", dir.display()))?;
+
+        let mut hasher = DefaultHasher::new();
+        CACHE_FORMAT.hash(&mut hasher);
+        env!("CARGO_PKG_VERSION").hash(&mut hasher);
+        // 버전을 올리지 않고 변환 코드만 바꿔 다시 빌드한 경우도 무효화되도록 실행 파일의 크기/수정 시각을 포함합니다.
+        if let Ok(meta) = std::env::current_exe().and_then(fs::metadata) {
+            meta.len().hash(&mut hasher);
+            meta.modified().ok().hash(&mut hasher);
+        }
+        serde_json::to_string(rules)?.hash(&mut hasher);
+
+        Ok(OutcomeCache { dir: dir.to_path_buf(), rules_key: hasher.finish() })
+    }
+
+    fn entry_path(&self, source_code: &str) -> PathBuf {
+        let mut hasher = DefaultHasher::new();
+        self.rules_key.hash(&mut hasher);
+        source_code.hash(&mut hasher);
+        self.dir.join(format!("{:016x}-{:x}.json", hasher.finish(), source_code.len()))
+    }
+
+    /// 항목 파일 이름과 독립적인 (다른 시드의) 원본 확인용 해시
+    fn source_check(&self, source_code: &str) -> u64 {
+        let mut hasher = DefaultHasher::new();
+        "source-check".hash(&mut hasher);
+        self.rules_key.hash(&mut hasher);
+        source_code.hash(&mut hasher);
+        hasher.finish()
+    }
+
+    /// 캐시 항목을 읽습니다. 없거나 손상되었거나 다른 원본의 항목이면 캐시 미스로 처리합니다.
+    fn load(&self, entry: &Path, source_code: &str) -> Option<FileOutcome> {
+        let json = fs::read_to_string(entry).ok()?;
+        let entry: CacheEntry<FileOutcome> = serde_json::from_str(&json).ok()?;
+
+        let is_same_source =
+            entry.source_len == source_code.len() && entry.source_check == self.source_check(source_code);
+        is_same_source.then_some(entry.outcome)
+    }
+
+    /// 임시 파일에 쓴 뒤 rename하여, 다른 스레드/프로세스가 반쯤 쓰인 항목을 읽지 않도록 합니다.
+    fn store(&self, entry: &Path, source_code: &str, outcome: &FileOutcome) -> Result<()> {
+        let seq = CACHE_TMP_SEQ.fetch_add(1, Ordering::Relaxed);
+        let tmp = entry.with_extension(format!("{}.{}.tmp", std::process::id(), seq));
+
+        // 파일 크기만 한 중간 JSON 문자열을 만들지 않고 버퍼링된 파일로 바로 직렬화합니다.
+        let written = (|| -> std::io::Result<()> {
+            let mut writer = BufWriter::new(fs::File::create(&tmp)?);
+            let entry_data = CacheEntry {
+                source_len: source_code.len(),
+                source_check: self.source_check(source_code),
+                outcome,
+            };
+            serde_json::to_writer(&mut writer, &entry_data)?;
+            writer.flush()?;
+            drop(writer);
+            fs::rename(&tmp, entry)
+        })();
+
+        if written.is_err() {
+            // 반쯤 쓰인 (또는 rename되지 못한) 임시 파일이 캐시 디렉터리에 계속 남지 않도록 정리합니다.
+            let _ = fs::remove_file(&tmp);
+        }
+        written.with_context(|| format!("Failed to write cache entry: {}", entry.display()))
+    }
+}
+
+/// 소스 코드를 AST로 파싱하고 규칙을 적용합니다.
+/// 캐시가 주어지면 같은 내용의 이전 변환 결과를 재사용합니다.
+fn modernize_source(
+    path: &Path,
+    source_code: &str,
+    rules: &RuleSet,
+    cache: Option<&OutcomeCache>,
+) -> Result<FileOutcome> {
+    let entry = cache.map(|cache| cache.entry_path(source_code));
+    if let (Some(cache), Some(entry)) = (cache, &entry) {
+        if let Some(outcome) = cache.load(entry, source_code) {
+            return Ok(outcome);
+        }
+    }
+
+    let outcome = transform_source(path, source_code, rules)?;
+
+    if let (Some(cache), Some(entry)) = (cache, &entry) {
+        // 캐시 저장 실패는 변환 결과에 영향을 주지 않으므로 경고만 출력합니다.
+        if let Err(err) = cache.store(entry, source_code, &outcome) {
+            println!("⚠️ {:#}", err);
+        }
+    }
+    Ok(outcome)
+}
+
+/// 소스 코드를 AST로 파싱하고 규칙을 적용합니다. (캐시/사전 필터 없이 항상 수행)
+fn transform_source(path: &Path, source_code: &str, rules: &RuleSet) -> Result<FileOutcome> {
+    let mut ast = syn::parse_file(source_code)
+        .with_context(|| format!("Failed to parse Rust code as AST: {}", path.display()))?;
+
+    let mut modernizer = Modernizer::new(rules, source_code);
+    modernizer.visit_file_mut(&mut ast); // AST의 루트 노드(File)부터 변환기 적용
+
+    let modernized = modernizer.changed.then(|| prettyplease::unparse(&ast));
+    Ok(FileOutcome { modernized, counters: modernizer.counters, log: modernizer.log })
+}
+
+/// 디렉터리를 재귀적으로 순회하며 .rs 파일 경로를 수집합니다.
+/// - `skip_dir`(정규화된 경로)은 건너뜁니다. 출력 디렉터리가 입력 트리 안에 있을 때,
+///   이전 실행의 출력이 다시 수집되어 중첩되지 않도록 하기 위함입니다.
+/// - 디렉터리 심볼릭 링크는 따라가지 않습니다. (`sub/loop -> ..` 같은 순환 방지)
+fn collect_rs_files(dir: &Path, skip_dir: Option<&Path>, files: &mut Vec<PathBuf>) -> Result<()> {
+    let entries = fs::read_dir(dir)
+        .with_context(|| format!("Failed to read directory: {}", dir.display()))?;
+
+    for entry in entries {
+        let entry = entry?;
+        let file_type = entry.file_type()?;
+        let path = entry.path();
+
+        if file_type.is_dir() {
+            // 이름이 다르면 같은 디렉터리일 수 없으므로, 이름이 같을 때만 canonicalize(시스템 호출)로 확인합니다.
+            let is_skipped = skip_dir.is_some_and(|skip| {
+                skip.file_name() == Some(entry.file_name().as_os_str())
+                    && fs::canonicalize(&path).is_ok_and(|p| p == skip)
+            });
+            if !is_skipped {
+                collect_rs_files(&path, skip_dir, files)?;
+            }
+        } else if path.extension().is_some_and(|ext| ext == "rs")
+            && (file_type.is_file() || (file_type.is_symlink() && path.is_file()))
+        {
+            files.push(path);
+        }
+    }
+    Ok(())
+}
+
+/// 출력 디렉터리 골격을 미리 한 번에 만듭니다.
+/// 파일마다 create_dir_all(stat + mkdir)을 호출하지 않고, 서로 다른 디렉터리마다 한 번만 호출합니다.
+/// 변환할 파일이 없어도 출력 디렉터리 자체(빈 상대 경로)는 만듭니다.
+fn create_output_dirs(files: &[PathBuf], input_dir: &Path, output_dir: &Path) -> Result<()> {
+    let dirs: BTreeSet<&Path> = files
+        .iter()
+        .filter_map(|src| src.strip_prefix(input_dir).ok()?.parent())
+        .chain([Path::new("")])
+        .collect();
+
+    for rel in dirs {
+        let dir = output_dir.join(rel);
+        fs::create_dir_all(&dir)
+            .with_context(|| format!("Failed to create output directory: {}", dir.display()))?;
+    }
+    Ok(())
+}
+
+/// 디렉터리 모드의 파일 하나를 변환하고 출력 디렉터리의 같은 상대 경로에 저장합니다.
+/// `source_code`는 작업 스레드마다 하나씩 두고 재사용하는 읽기 버퍼입니다.
+/// (작은 파일이 많은 트리에서 파일마다 새 버퍼를 할당하지 않기 위함)
+fn process_file(
+    src: &Path,
+    dst: &Path,
+    rules: &RuleSet,
+    cache: Option<&OutcomeCache>,
+    dry_run: bool,
+    source_code: &mut String,
+) -> Result<HashMap<String, u32>> {
+    source_code.clear();
+    fs::File::open(src)
+        .and_then(|mut file| file.read_to_string(source_code))
+        .with_context(|| format!("Failed to read input file: {}", src.display()))?;
+
+    // 규칙 이름이 전혀 등장하지 않는 파일은 파싱 없이 변경 없음으로 처리합니다. (디렉터리 모드 전용)
+    // 단일 파일 모드는 사용자가 지정한 입력이므로 항상 파싱하여 문법 오류를 보고합니다.
+    let outcome = if rules.may_apply(source_code) {
+        modernize_source(src, source_code, rules, cache)?
+    } else {
+        FileOutcome { modernized: None, counters: HashMap::new(), log: Vec::new() }
+    };
+    // 여러 작업 스레드가 동시에 출력하므로, 파일 경로를 붙인 로그를 한 번의 print!로 내보냅니다.
+    if !outcome.log.is_empty() {
+        let lines: String = outcome.log.iter().map(|line| format!("{}: {}\n", src.display(), line)).collect();
+        print!("{}", lines);
+    }
+    if dry_run {
+        return Ok(outcome.counters);
+    }
+
+    match &outcome.modernized {
+        Some(code) => fs::write(dst, code)
+            .with_context(|| format!("Failed to write output file: {}", dst.display()))?,
+        None => copy_unchanged(src, dst)?,
+    }
+
+    Ok(outcome.counters)
+}
+
+/// 두 경로가 (표기와 무관하게) 같은 디렉터리를 가리키는지 확인합니다.
+/// 아직 존재하지 않는 출력 경로는 입력과 같을 수 없으므로 false입니다.
+fn is_same_dir(a: &Path, b: &Path) -> bool {
+    matches!((fs::canonicalize(a), fs::canonicalize(b)), (Ok(a), Ok(b)) if a == b)
+}
+
+/// 출력 트리가 입력 트리와 같은 구조가 되도록 변경되지 않은 파일도 복사합니다.
+/// (inplace면 생략. 별칭 경로는 modernize_dir에서 미리 입력 경로로 통일됨)
+/// 읽어 둔 버퍼를 다시 쓰지 않고 fs::copy로 커널 내 복사(copy_file_range 등)를 사용합니다.
+fn copy_unchanged(src: &Path, dst: &Path) -> Result<()> {
+    if src == dst {
+        return Ok(());
+    }
+    fs::copy(src, dst)
+        .with_context(|| format!("Failed to copy {} to {}", src.display(), dst.display()))?;
+    Ok(())
+}
+
+/// 작업 스레드 하나의 처리 결과 (규칙 ID별 카운터, 실패한 파일과 오류 목록)
+type WorkerResult = (HashMap<String, u32>, Vec<(PathBuf, anyhow::Error)>);
+
+/// 디렉터리 아래의 모든 .rs 파일을 CPU 코어 수만큼의 스레드로 병렬 변환합니다.
+/// 파일끼리는 독립적이므로, 파일 목록을 먼저 한 번에 수집한 뒤 작업 스레드가 나누어 처리합니다.
+fn modernize_dir(
+    input_dir: &Path,
+    output_dir: &Path,
+    rules: &RuleSet,
+    cache: Option<&OutcomeCache>,
+    dry_run: bool,
+) -> Result<()> {
+    // 출력 디렉터리가 다른 표기(./in, 심볼릭 링크 등)로 입력 디렉터리를 가리키면 --inplace로 취급합니다.
+    // 그대로 두면 fs::copy가 대상(= 원본)을 먼저 잘라낸 뒤 복사하므로 변경 없는 파일이 비어 버립니다.
+    let output_dir = if is_same_dir(input_dir, output_dir) { input_dir } else { output_dir };
+
+    // 입력 트리 안에 있는 (이전 실행의) 출력 디렉터리는 수집 대상에서 제외합니다.
+    let skip_dir = if input_dir != output_dir { fs::canonicalize(output_dir).ok() } else { None };
+
+    let mut files = Vec::new();
+    collect_rs_files(input_dir, skip_dir.as_deref(), &mut files)?;
+    if !dry_run && input_dir != output_dir {
+        create_output_dirs(&files, input_dir, output_dir)?;
+    }
+
+    // 적용할 규칙이 없으면 (규칙 파일이 비었거나 모두 알 수 없는 ID) 읽기/파싱 없이 복사만 합니다.
+    // 하드 링크는 쓰지 않습니다: 이후 출력 트리를 --inplace로 다시 변환하면 원본까지 바뀌기 때문입니다.
+    // 입력과 출력이 같은 디렉터리(--inplace 또는 별칭 경로)이면 아무것도 하지 않습니다.
+    if rules.is_empty() {
+        println!("\nℹ️ 적용할 규칙이 없어 {} file(s)를 변환 없이 복사합니다.", files.len());
+        if !dry_run && input_dir != output_dir {
+            for src in &files {
+                copy_unchanged(src, &output_dir.join(src.strip_prefix(input_dir).unwrap_or(src)))?;
+            }
+        }
+        return Ok(());
+    }
+
+    println!("\n⚙️ Modernizing {} file(s) using AST traversal...", files.len());
+
+    let workers = thread::available_parallelism().map_or(1, |n| n.get()).min(files.len().max(1));
+    let next = AtomicUsize::new(0);
+
+    let results: Vec<WorkerResult> = thread::scope(|scope| {
+        let handles: Vec<_> = (0..workers)
+            .map(|_| {
+                scope.spawn(|| {
+                    let mut counters = HashMap::new();
+                    let mut failures = Vec::new();
+                    let mut source_code = String::new();
+
+                    while let Some(src) = files.get(next.fetch_add(1, Ordering::Relaxed)) {
+                        let rel = src.strip_prefix(input_dir).unwrap_or(src);
+                        match process_file(src, &output_dir.join(rel), rules, cache, dry_run, &mut source_code) {
+                            Ok(file_counters) => {
+                                for (id, count) in file_counters {
+                                    *counters.entry(id).or_insert(0) += count;
+                                }
+                            }
+                            Err(err) => failures.push((src.clone(), err)),
+                        }
+                    }
+                    (counters, failures)
+                })
+            })
+            .collect();
+
+        handles.into_iter().map(|h| h.join().expect("worker thread panicked")).collect()
+    });
+
+    let mut counters: HashMap<String, u32> = HashMap::new();
+    let mut failures = Vec::new();
+    for (worker_counters, worker_failures) in results {
+        for (id, count) in worker_counters {
+            *counters.entry(id).or_insert(0) += count;
+        }
+        failures.extend(worker_failures);
+    }
+
+    if counters.is_empty() {
+        println!("\nℹ️ 코드 변경 사항이 감지되지 않았습니다.");
+    } else {
+        println!("\n📊 변환 보고서:");
+        for (id, count) in &counters {
+            println!("  - {} 건 ({})", count, id);
+        }
+    }
+
+    for (path, err) in &failures {
+        println!("❌ {}: {:#}", path.display(), err);
+    }
+    if !failures.is_empty() {
+        anyhow::bail!("Failed to modernize {} of {} file(s)", failures.len(), files.len());
+    }
+
+    if !dry_run {
+        println!("\n✅ 변환 완료! 디렉터리 저장됨.");
+        println!("→ {}", output_dir.display());
+    }
+    Ok(())
+}
+
 fn main() -> Result<()> {
     // 1. CLI 인자 파싱
     let args = Args::parse();
     
     // 2. 규칙 로드
-    let rules = load_rules(&args.rules_file)?; // 
+    let rule_list = load_rules(&args.rules_file)?;
+    let rules = RuleSet::new(&rule_list)?;
+    let cache = match &args.cache_dir {
+        Some(dir) => Some(OutcomeCache::new(dir, &rule_list)?),
+        None => None,
+    };
+    let input_is_dir = args.input.is_dir();
 
     // 3. 출력 경로 결정
     let output_path = match &args.output {
         Some(path) => path.clone(),
         None if args.inplace => args.input.clone(),
+        None if input_is_dir => PathBuf::from("modernized_output"),
         None => PathBuf::from("modernized_output.rs"),
     };
     
@@ -251,39 +730,48 @@ fn main() -> Result<()> {
     println!("============================================");
     println!("    Rust Legacy → Modern Migration Tool");
     println!("============================================\n");
+    if input_is_dir {
+        println!("📂 입력 디렉터리: {}", args.input.display());
+        if !args.dry_run {
+            println!("📁 출력 디렉터리: {}", output_path.display());
+        }
+        return modernize_dir(&args.input, &output_path, &rules, cache.as_ref(), args.dry_run);
+    }
     println!("📄 입력 파일: {}", args.input.display());
     if !args.dry_run {
         println!("📁 출력 파일: {}", output_path.display());
     }
 
-    // 4. 파일 읽기 및 AST 생성
+    if rules.is_empty() {
+        println!("\nℹ️ 적용할 규칙이 없어 변환을 건너뜁니다.");
+        return Ok(());
+    }
+
+    // 4. 파일 읽기
     let source_code = fs::read_to_string(&args.input)
         .with_context(|| format!("Failed to read input file: {}", args.input.display()))?;
     
-    let mut ast = syn::parse_file(&source_code)
-        .with_context(|| format!("Failed to parse Rust code as AST: {}", args.input.display()))?;
-    
-    // 5. AST 변환 적용
+    // 5. AST 생성 및 변환 적용
     println!("\n⚙️ Modernizing code using AST traversal...");
-    let mut modernizer = Modernizer::new(rules);
-    modernizer.visit_file_mut(&mut ast); // AST의 루트 노드(File)부터 변환기 적용
+    let outcome = modernize_source(&args.input, &source_code, &rules, cache.as_ref())?;
+    for line in &outcome.log {
+        println!("{}", line);
+    }
 
     // 6. 변경 사항 확인 및 보고서 출력
-    if !modernizer.changed {
+    let Some(modernized_code) = outcome.modernized else {
         println!("\nℹ️ 코드 변경 사항이 감지되지 않았습니다.");
         return Ok(());
-    }
+    };
     
     println!("\n📊 변환 보고서:");
-    for (id, count) in modernizer.counters {
+    for (id, count) in outcome.counters {
         // 규칙 ID를 기반으로 출력
         println!("  - {} 건 ({})", count, id);
     }
 
 
-    // 7. AST를 코드 문자열로 재구성 및 8. 파일 I/O
-    let modernized_code = prettyplease::unparse(&ast); 
-
+    // 7. 파일 I/O
     if args.dry_run {
         println!("\n📄 Dry Run 결과 코드 (파일 저장 안 함):");
         println!("--------------------------------------------");
@@ -299,3 +787,292 @@ fn main() -> Result<()> {
     
     Ok(())
 }
+
+/// ----------------------------------------------------
+/// 4. 테스트
+/// ----------------------------------------------------
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// 저장소의 기본 규칙 파일
+    fn default_rules() -> Vec<ModernizerRule> {
+        serde_json::from_str(include_str!("../modernizer_rules.json")).unwrap()
+    }
+
+    /// 포맷과 무관하게 비교할 수 있도록 코드를 토큰 문자열로 정규화합니다.
+    fn normalize(code: &str) -> String {
+        let file = syn::parse_file(code).unwrap();
+        quote::ToTokens::to_token_stream(&file).to_string()
+    }
+
+    /// 테스트마다 비어 있는 임시 디렉터리를 만듭니다.
+    fn temp_dir(name: &str) -> PathBuf {
+        let dir = std::env::temp_dir().join(format!("rust_modernizer-{}-{}", name, std::process::id()));
+        let _ = fs::remove_dir_all(&dir);
+        fs::create_dir_all(&dir).unwrap();
+        dir
+    }
+
+    const LEGACY_SOURCE: &str = "fn main() -> Option<()> { let v = Some(1).unwrap(); Some(()) }\n";
+    const MODERN_SOURCE: &str = "fn add(a: i32, b: i32) -> i32 { a + b }\n";
+
+    /// 기본 규칙으로 변환한 결과 코드 (변경이 없으면 None)
+    fn transform(code: &str) -> Option<String> {
+        let rules = RuleSet::new(&default_rules()).unwrap();
+        transform_source(Path::new("test.rs"), code, &rules).unwrap().modernized
+    }
+
+    #[test]
+    fn group_rules_keeps_file_order_within_a_name() {
+        let rules = RuleSet::new(&default_rules()).unwrap();
+
+        let names: Vec<&str> = rules.method_rules.iter().map(|(name, _)| name.as_str()).collect();
+        assert_eq!(names, ["unwrap", "expect"]);
+
+        let (_, unwrap_rules) = &rules.method_rules[0];
+        let ids: Vec<&str> = unwrap_rules.iter().map(|(_, r)| r.id.as_str()).collect();
+        assert_eq!(ids, ["unwrap_to_try", "ok_unwrap_to_try"]);
+    }
+
+    #[test]
+    fn first_matching_rule_in_file_order_wins() {
+        // 파일 순서상 unwrap_to_try가 먼저이므로 `.ok()`는 남고 `.unwrap()`만 `?`로 바뀝니다.
+        let output = transform("fn f() -> Option<()> { x.ok().unwrap(); None }").unwrap();
+        assert_eq!(normalize(&output), normalize("fn f() -> Option<()> { x.ok()?; None }"));
+    }
+
+    #[test]
+    fn rewrites_long_method_chains() {
+        let links = 200;
+        let legacy = format!("fn f() -> Option<()> {{ a(){}.c().expect(\"x\"); None }}", ".unwrap().b()".repeat(links));
+        let modern = format!("fn f() -> Option<()> {{ a(){}.c()?; None }}", "?.b()".repeat(links));
+        assert_eq!(normalize(&transform(&legacy).unwrap()), normalize(&modern));
+    }
+
+    #[test]
+    fn mod_log_is_collected_per_file() {
+        let source = "fn f() -> Option<()> { a().unwrap().b().unwrap(); None }";
+        let outcome = transform_source(Path::new("f.rs"), source, &RuleSet::new(&default_rules()).unwrap()).unwrap();
+        assert_eq!(outcome.log.len(), 2);
+        assert!(outcome.log.iter().all(|line| line.starts_with("[MOD]") && line.contains("unwrap")));
+    }
+
+    #[test]
+    fn escaped_deprecated_literal_is_reported() {
+        let source = r#"fn f() { let s = "mem::uninit\x69alized"; }"#;
+        let outcome = transform_source(Path::new("f.rs"), source, &RuleSet::new(&default_rules()).unwrap()).unwrap();
+        assert!(outcome.modernized.is_none());
+        assert_eq!(outcome.log, ["[MOD] ℹ️ Found deprecated string pattern in literal."]);
+    }
+
+    #[test]
+    fn may_apply_detects_rule_triggers() {
+        let rules = RuleSet::new(&default_rules()).unwrap();
+
+        assert!(rules.may_apply(LEGACY_SOURCE));
+        assert!(rules.may_apply("fn f() { let s = \"std::mem::uninitialized\"; }"));
+        assert!(!rules.may_apply(MODERN_SOURCE));
+    }
+
+    #[test]
+    fn single_file_mode_reports_invalid_input_without_triggers() {
+        let rules = RuleSet::new(&default_rules()).unwrap();
+        assert!(modernize_source(Path::new("broken.rs"), "fn broken( {", &rules, None).is_err());
+    }
+
+    #[test]
+    fn outcome_cache_round_trip() {
+        let dir = temp_dir("cache");
+        let cache = OutcomeCache::new(&dir, &default_rules()).unwrap();
+
+        let mut counters = HashMap::new();
+        counters.insert("unwrap_to_try".to_string(), 1);
+        let outcome = FileOutcome {
+            modernized: Some("fn main() {}".to_string()),
+            counters,
+            log: vec!["[MOD] line".to_string()],
+        };
+
+        let entry = cache.entry_path(LEGACY_SOURCE);
+        cache.store(&entry, LEGACY_SOURCE, &outcome).unwrap();
+
+        let loaded = cache.load(&entry, LEGACY_SOURCE).unwrap();
+        assert_eq!(loaded.modernized, outcome.modernized);
+        assert_eq!(loaded.counters, outcome.counters);
+        assert_eq!(loaded.log, outcome.log);
+
+        // 같은 항목 파일이라도 원본이 다르면 캐시 미스여야 합니다.
+        assert!(cache.load(&entry, MODERN_SOURCE).is_none());
+        // 임시 파일은 남지 않아야 합니다.
+        assert_eq!(fs::read_dir(&dir).unwrap().count(), 1);
+
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn outcome_cache_removes_tmp_file_on_failed_store() {
+        let dir = temp_dir("cache-fail");
+        let cache = OutcomeCache::new(&dir, &default_rules()).unwrap();
+        let outcome = FileOutcome { modernized: None, counters: HashMap::new(), log: Vec::new() };
+
+        // 항목 경로에 비어 있지 않은 디렉터리가 있으면 임시 파일은 써지지만 rename이 실패합니다.
+        let entry = dir.join("entry.json");
+        fs::create_dir_all(entry.join("occupied")).unwrap();
+        assert!(cache.store(&entry, LEGACY_SOURCE, &outcome).is_err());
+
+        let names: Vec<_> = fs::read_dir(&dir).unwrap().map(|e| e.unwrap().file_name()).collect();
+        assert_eq!(names, ["entry.json"]);
+
+        fs::remove_dir_all(&dir).unwrap();
+    }
+
+    #[test]
+    fn directory_mode_passes_through_files_without_triggers() {
+        let root = temp_dir("prefilter");
+        let (src, dst) = (root.join("broken.rs"), root.join("out.rs"));
+        fs::write(&src, "fn broken( {").unwrap();
+
+        let rules = RuleSet::new(&default_rules()).unwrap();
+        let counters = process_file(&src, &dst, &rules, None, false, &mut String::new()).unwrap();
+
+        assert!(counters.is_empty());
+        assert_eq!(fs::read_to_string(&dst).unwrap(), "fn broken( {");
+        fs::remove_dir_all(&root).unwrap();
+    }
+
+    #[test]
+    fn modernize_dir_mirrors_tree_and_keeps_unchanged_files() {
+        let root = temp_dir("dir");
+        let input = root.join("in");
+        let output = root.join("out");
+        fs::create_dir_all(input.join("sub")).unwrap();
+        fs::write(input.join("legacy.rs"), LEGACY_SOURCE).unwrap();
+        fs::write(input.join("sub/modern.rs"), MODERN_SOURCE).unwrap();
+
+        let rules = RuleSet::new(&default_rules()).unwrap();
+        modernize_dir(&input, &output, &rules, None, false).unwrap();
+
+        assert_eq!(fs::read_to_string(output.join("sub/modern.rs")).unwrap(), MODERN_SOURCE);
+        let modernized = fs::read_to_string(output.join("legacy.rs")).unwrap();
+        assert!(!modernized.contains("unwrap"));
+        // 원본은 그대로여야 합니다.
+        assert_eq!(fs::read_to_string(input.join("legacy.rs")).unwrap(), LEGACY_SOURCE);
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+
+    #[test]
+    fn modernize_dir_skips_output_dir_inside_input() {
+        let root = temp_dir("nested");
+        let output = root.join("modernized_output");
+        fs::write(root.join("modern.rs"), MODERN_SOURCE).unwrap();
+        // 출력 디렉터리와 이름만 같은 하위 디렉터리는 건너뛰면 안 됩니다.
+        fs::create_dir_all(root.join("sub/modernized_output")).unwrap();
+        fs::write(root.join("sub/modernized_output/kept.rs"), MODERN_SOURCE).unwrap();
+        // 출력 디렉터리가 이미 있어야 첫 실행부터 건너뛰기 대상이 됩니다.
+        fs::create_dir_all(&output).unwrap();
+
+        let rules = RuleSet::new(&default_rules()).unwrap();
+        for _ in 0..2 {
+            modernize_dir(&root, &output, &rules, None, false).unwrap();
+        }
+        assert!(output.join("modern.rs").is_file());
+        assert!(output.join("sub/modernized_output/kept.rs").is_file());
+        assert!(!output.join("modernized_output").exists());
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+
+    #[cfg(unix)]
+    #[test]
+    fn modernize_dir_does_not_follow_directory_symlinks() {
+        let root = temp_dir("symlink");
+        let input = root.join("in");
+        fs::create_dir_all(input.join("sub")).unwrap();
+        fs::write(input.join("sub/modern.rs"), MODERN_SOURCE).unwrap();
+        std::os::unix::fs::symlink("..", input.join("sub/loop")).unwrap();
+
+        let mut files = Vec::new();
+        collect_rs_files(&input, None, &mut files).unwrap();
+        assert_eq!(files, [input.join("sub/modern.rs")]);
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+
+    #[test]
+    fn create_output_dirs_builds_the_skeleton() {
+        let root = temp_dir("skeleton");
+        let (input, output) = (root.join("in"), root.join("out"));
+        let files = [input.join("a.rs"), input.join("x/b.rs"), input.join("x/y/c.rs"), input.join("z/d.rs")];
+
+        create_output_dirs(&files, &input, &output).unwrap();
+        for dir in ["", "x", "x/y", "z"] {
+            assert!(output.join(dir).is_dir(), "{dir}");
+        }
+        assert_eq!(fs::read_dir(&output).unwrap().count(), 2);
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+
+    #[test]
+    fn modernize_dir_creates_output_dir_for_empty_tree() {
+        let root = temp_dir("empty");
+        let (input, output) = (root.join("in"), root.join("out"));
+        fs::create_dir_all(&input).unwrap();
+
+        modernize_dir(&input, &output, &RuleSet::new(&default_rules()).unwrap(), None, false).unwrap();
+        assert!(output.is_dir());
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+
+    #[test]
+    fn unknown_rule_ids_are_dropped() {
+        let mut rule_list = default_rules();
+        for rule in &mut rule_list {
+            rule.id = format!("{}_unknown", rule.id);
+        }
+        assert!(RuleSet::new(&rule_list).unwrap().is_empty());
+    }
+
+    #[test]
+    fn mem_uninitialized_is_replaced_with_maybe_uninit() {
+        let legacy = "fn f() { let x: u32 = unsafe { std::mem::uninitialized() }; }";
+        let modern = "fn f() { let x: u32 = unsafe { unsafe { std::mem::MaybeUninit::uninit().assume_init() } }; }";
+        assert_eq!(normalize(&transform(legacy).unwrap()), normalize(modern));
+    }
+
+    #[test]
+    fn modernize_dir_with_aliased_output_does_not_truncate_sources() {
+        let root = temp_dir("alias");
+        let input = root.join("in");
+        fs::create_dir_all(&input).unwrap();
+        fs::write(input.join("modern.rs"), MODERN_SOURCE).unwrap();
+
+        // 입력 디렉터리를 다른 표기로 가리키는 출력 경로 (Path 비교로는 같다고 판단되지 않음)
+        let aliased = input.join("../in");
+        assert_ne!(aliased, input);
+
+        let rules = RuleSet::new(&default_rules()).unwrap();
+        modernize_dir(&input, &aliased, &rules, None, false).unwrap();
+        assert_eq!(fs::read_to_string(input.join("modern.rs")).unwrap(), MODERN_SOURCE);
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+
+    #[test]
+    fn empty_ruleset_with_aliased_output_does_not_truncate_sources() {
+        let root = temp_dir("alias-empty");
+        let input = root.join("in");
+        fs::create_dir_all(&input).unwrap();
+        fs::write(input.join("modern.rs"), MODERN_SOURCE).unwrap();
+
+        let empty_rules = RuleSet::new(&[]).unwrap();
+        assert!(empty_rules.is_empty());
+        modernize_dir(&input, &input.join("../in"), &empty_rules, None, false).unwrap();
+        assert_eq!(fs::read_to_string(input.join("modern.rs")).unwrap(), MODERN_SOURCE);
+
+        fs::remove_dir_all(&root).unwrap();
+    }
+}